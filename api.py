@@ -1,21 +1,45 @@
 # api.py
 import os
 import sys
-import json
+import asyncio
+import functools
 import logging
-from flask import Flask, request, jsonify, send_from_directory, Response
-from flask_cors import CORS
-from translate import translate, compare_meanings, MAX_INPUT_LENGTH
+import orjson
+from pydantic import BaseModel, Field, ValidationError, field_validator
+from quart import Quart, request, jsonify, send_from_directory, Response
+from quart.json.provider import DefaultJSONProvider
+from quart_cors import cors
+from translate import (translate_async, translate_stream_async,
+                       translate_pipeline_async, compare_meanings_async,
+                       FUSED_PIPELINE, MAX_INPUT_LENGTH, _configure_logging)
+import batching
 
-app = Flask(__name__)
-CORS(app)
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson, so jsonify/get_json use its
+    SIMD-accelerated serialization instead of stdlib json."""
+    def dumps(self, object_, **kwargs):
+        return orjson.dumps(object_).decode()
+
+    def loads(self, object_, **kwargs):
+        return orjson.loads(object_)
+
+app = Quart(__name__)
+app.json = OrjsonProvider(app)
+app = cors(app)
+
+# Micro-batching: pack concurrent translations into one OpenRouter call
+# when TRANSBACK_BATCHING=1 is set
+BATCHER = batching.BatchingTranslator() if batching.ENABLED else None
+
+async def _translate(text, source, target, api_key, model):
+    """Translate via the micro-batcher when enabled, else one call per text."""
+    if BATCHER is not None:
+        return await BATCHER.translate(text, source, target, api_key, model)
+    return await translate_async(text, source, target, api_key, model)
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
+_configure_logging()
+logger = logging.getLogger("transback.api")
 
 # Allowed models for translation
 ALLOWED_MODELS = {
@@ -28,18 +52,82 @@ def validate_model(model: str) -> bool:
     """Validate that the model is in the allowed list."""
     return model in ALLOWED_MODELS
 
+class TranslateRequest(BaseModel):
+    """Validated body of the /translate and /translate/stream endpoints.
+    pydantic-core parses the JSON and runs the checks in compiled Rust."""
+    text: str = Field(min_length=1, max_length=MAX_INPUT_LENGTH)
+    source: str = 'en'
+    target: str = 'af'
+    model: str = 'qwen/qwen3-235b-a22b-2507'
+
+    @field_validator('model')
+    @classmethod
+    def _model_allowed(cls, value: str) -> str:
+        if not validate_model(value):
+            raise ValueError(f"Invalid model. Allowed models: {', '.join(sorted(ALLOWED_MODELS))}")
+        return value
+
+def _validation_error_message(e: ValidationError) -> str:
+    """Reduce a ValidationError to the single-line error string the API returns."""
+    first = e.errors()[0]
+    loc = '.'.join(str(part) for part in first['loc']) or 'body'
+    return f"{loc}: {first['msg']}"
+
+_SSE_END = b"\n\n"
+
+@functools.lru_cache(maxsize=16)
+def _sse_prefix(event: str) -> bytes:
+    # Event names come from a fixed set, so each prefix is encoded once
+    return b"event: " + event.encode() + b"\ndata: "
+
+def _sse(event: str, payload: dict) -> bytes:
+    """Build a complete SSE frame as bytes, serialized once per event so any
+    number of writers can share the same frame object."""
+    return _sse_prefix(event) + orjson.dumps(payload) + _SSE_END
+
+# Comment frames keep intermediaries (nginx, Cloudflare, mobile networks)
+# from dropping the stream while an LLM call is quietly generating
+SSE_KEEPALIVE_SECONDS = 15
+_SSE_KEEPALIVE = b": keepalive\n\n"
+
+async def _with_keepalive(frames):
+    """Pump SSE frames from the pipeline through a queue, yielding a comment
+    keepalive whenever the upstream has been silent for a while."""
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def pump():
+        try:
+            async for frame in frames:
+                await queue.put(frame)
+        finally:
+            await queue.put(None)
+
+    task = asyncio.create_task(pump())
+    try:
+        while True:
+            try:
+                frame = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield _SSE_KEEPALIVE
+                continue
+            if frame is None:
+                break
+            yield frame
+    finally:
+        task.cancel()
+
 @app.route('/')
-def index():
+async def index():
     """Serve the HTML frontend"""
-    return send_from_directory('.', 'index.html')
+    return await send_from_directory('.', 'index.html')
 
 @app.route('/<path:filename>')
-def serve_static(filename):
+async def serve_static(filename):
     """Serve static files (JS, CSS, etc.)"""
-    return send_from_directory('.', filename)
+    return await send_from_directory('.', filename)
 
 @app.route('/translate', methods=['POST'])
-def translate_text():
+async def translate_text():
     """
     Translate text endpoint.
 
@@ -50,7 +138,7 @@ def translate_text():
         "target": "af",  // optional, default: "af"
         "model": "qwen/qwen3-235b-a22b-2507"  // optional
     }
-    
+
     Returns JSON:
     {
         "translated": "Translated text",
@@ -62,56 +150,52 @@ def translate_text():
         # Get API key from environment
         api_key = os.getenv("OPENROUTER_API_KEY")
         if not api_key:
-            logging.error("OPENROUTER_API_KEY environment variable not set")
+            logger.error("OPENROUTER_API_KEY environment variable not set")
             return jsonify({"error": "Server configuration error: API key not set"}), 500
-        
-        # Parse request body
-        data = request.get_json()
-        if not data:
-            return jsonify({"error": "Request body must be JSON"}), 400
-        
-        text = data.get('text')
-        if not text:
-            return jsonify({"error": "Missing required field: text"}), 400
-        if len(text) > MAX_INPUT_LENGTH:
-            return jsonify({"error": f"Text too long. Limit is {MAX_INPUT_LENGTH} characters."}), 400
-        
-        source = data.get('source', 'en')
-        target = data.get('target', 'af')
-        model = data.get('model', 'qwen/qwen3-235b-a22b-2507')
-        
-        # Validate model
-        if not validate_model(model):
-            return jsonify({"error": f"Invalid model. Allowed models: {', '.join(sorted(ALLOWED_MODELS))}"}), 400
-        
-        logging.info(f"Translation request: {len(text)} chars, {source} -> {target}, model: {model}")
-        
+
+        # Validate request body
+        try:
+            req = TranslateRequest.model_validate_json(await request.get_data())
+        except ValidationError as e:
+            return jsonify({"error": _validation_error_message(e)}), 400
+        text, source, target, model = req.text, req.source, req.target, req.model
+
+        logger.info("Translation request: %d chars, %s -> %s, model: %s", len(text), source, target, model)
+
+        if FUSED_PIPELINE:
+            try:
+                result = await translate_pipeline_async(text, source, target, api_key, model)
+                logger.info("Translation completed successfully (fused)")
+                return jsonify(result)
+            except Exception as e:
+                logger.warning("Fused pipeline failed (%s); falling back to three-step chain", e)
+
         # Step 1: Translate to target language
-        logging.info("Step 1/3: Translating to target language")
-        translated = translate(text, source, target, api_key, model)
-        
+        logger.info("Step 1/3: Translating to target language")
+        translated = await _translate(text, source, target, api_key, model)
+
         # Step 2: Back-translate to source language
-        logging.info("Step 2/3: Back-translating to source language")
-        back_translated = translate(translated, target, source, api_key, model)
-        
+        logger.info("Step 2/3: Back-translating to source language")
+        back_translated = await _translate(translated, target, source, api_key, model)
+
         # Step 3: Compare meanings
-        logging.info("Step 3/3: Comparing meanings")
-        review = compare_meanings(text, back_translated, source, api_key, model)
-        
-        logging.info("Translation completed successfully")
-        
+        logger.info("Step 3/3: Comparing meanings")
+        review = await compare_meanings_async(text, back_translated, source, api_key, model)
+
+        logger.info("Translation completed successfully")
+
         return jsonify({
             "translated": translated,
             "back_translated": back_translated,
             "review": review
         })
-    
+
     except Exception as e:
-        logging.error(f"Translation error: {str(e)}", exc_info=True)
+        logger.error("Translation error: %s", e, exc_info=True)
         return jsonify({"error": str(e)}), 500
 
 @app.route('/translate/stream', methods=['POST'])
-def translate_text_stream():
+async def translate_text_stream():
     """
     Streaming translation endpoint using Server-Sent Events (SSE).
 
@@ -122,9 +206,11 @@ def translate_text_stream():
         "target": "af",  // optional, default: "af"
         "model": "qwen/qwen3-235b-a22b-2507"  // optional
     }
-    
+
     Returns SSE stream with events:
+    - event: translated_delta (data: {"delta": "..."}) - incremental tokens
     - event: translated (data: {"translated": "..."})
+    - event: back_translated_delta (data: {"delta": "..."}) - incremental tokens
     - event: back_translated (data: {"back_translated": "..."})
     - event: review (data: {"review": "..."})
     - event: complete (data: {})
@@ -133,74 +219,76 @@ def translate_text_stream():
     # Get API key from environment
     api_key = os.getenv("OPENROUTER_API_KEY")
     if not api_key:
-        logging.error("OPENROUTER_API_KEY environment variable not set")
-        def error_gen():
-            yield f"event: error\ndata: {json.dumps({'error': 'Server configuration error: API key not set'})}\n\n"
-        return Response(error_gen(), mimetype='text/event-stream')
-    
-    # Parse request body
-    data = request.get_json()
-    if not data:
-        def error_gen():
-            yield f"event: error\ndata: {json.dumps({'error': 'Request body must be JSON'})}\n\n"
-        return Response(error_gen(), mimetype='text/event-stream')
-    
-    text = data.get('text')
-    if not text:
-        def error_gen():
-            yield f"event: error\ndata: {json.dumps({'error': 'Missing required field: text'})}\n\n"
+        logger.error("OPENROUTER_API_KEY environment variable not set")
+        async def error_gen():
+            yield _sse('error', {'error': 'Server configuration error: API key not set'})
         return Response(error_gen(), mimetype='text/event-stream')
-    if len(text) > MAX_INPUT_LENGTH:
-        def error_gen():
-            yield f"event: error\ndata: {json.dumps({'error': f'Text too long. Limit is {MAX_INPUT_LENGTH} characters.'})}\n\n"
-        return Response(error_gen(), mimetype='text/event-stream')
-    
-    source = data.get('source', 'en')
-    target = data.get('target', 'af')
-    model = data.get('model', 'qwen/qwen3-235b-a22b-2507')
-    
-    # Validate model
-    if not validate_model(model):
-        def error_gen():
-            yield f"event: error\ndata: {json.dumps({'error': f'Invalid model. Allowed models: {', '.join(sorted(ALLOWED_MODELS))}'})}\n\n"
+
+    # Validate request body
+    try:
+        req = TranslateRequest.model_validate_json(await request.get_data())
+    except ValidationError as e:
+        message = _validation_error_message(e)
+        async def error_gen():
+            yield _sse('error', {'error': message})
         return Response(error_gen(), mimetype='text/event-stream')
-    
-    logging.info(f"Streaming translation request: {len(text)} chars, {source} -> {target}, model: {model}")
-    
-    def generate(text, source, target, api_key, model):
+    text, source, target, model = req.text, req.source, req.target, req.model
+
+    logger.info("Streaming translation request: %d chars, %s -> %s, model: %s", len(text), source, target, model)
+
+    async def generate(text, source, target, api_key, model):
         try:
             # Step 1: Translate to target language
-            logging.info("Step 1/3: Translating to target language")
-            translated = translate(text, source, target, api_key, model)
-            event_data = json.dumps({'translated': translated})
-            logging.info(f"Sending translated event: {len(event_data)} chars")
-            yield f"event: translated\ndata: {event_data}\n\n"
-            
+            logger.info("Step 1/3: Translating to target language")
+            if BATCHER is not None:
+                translated = await BATCHER.translate(text, source, target, api_key, model)
+            else:
+                parts = []
+                async for delta in translate_stream_async(text, source, target, api_key, model):
+                    parts.append(delta)
+                    yield _sse('translated_delta', {'delta': delta})
+                translated = ''.join(parts)
+            frame = _sse('translated', {'translated': translated})
+            logger.info("Sending translated event: %d bytes", len(frame))
+            yield frame
+
             # Step 2: Back-translate to source language
-            logging.info("Step 2/3: Back-translating to source language")
-            back_translated = translate(translated, target, source, api_key, model)
-            event_data = json.dumps({'back_translated': back_translated})
-            logging.info(f"Sending back_translated event: {len(event_data)} chars")
-            yield f"event: back_translated\ndata: {event_data}\n\n"
-            
+            logger.info("Step 2/3: Back-translating to source language")
+            if BATCHER is not None:
+                back_translated = await BATCHER.translate(translated, target, source, api_key, model)
+            else:
+                parts = []
+                async for delta in translate_stream_async(translated, target, source, api_key, model):
+                    parts.append(delta)
+                    yield _sse('back_translated_delta', {'delta': delta})
+                back_translated = ''.join(parts)
+            frame = _sse('back_translated', {'back_translated': back_translated})
+            logger.info("Sending back_translated event: %d bytes", len(frame))
+            yield frame
+
             # Step 3: Compare meanings
-            logging.info("Step 3/3: Comparing meanings")
-            review = compare_meanings(text, back_translated, source, api_key, model)
-            event_data = json.dumps({'review': review})
-            logging.info(f"Sending review event: {len(event_data)} chars")
-            yield f"event: review\ndata: {event_data}\n\n"
-            
-            logging.info("Streaming translation completed successfully")
-            yield f"event: complete\ndata: {json.dumps({})}\n\n"
-        
+            logger.info("Step 3/3: Comparing meanings")
+            review = await compare_meanings_async(text, back_translated, source, api_key, model)
+            frame = _sse('review', {'review': review})
+            logger.info("Sending review event: %d bytes", len(frame))
+            yield frame
+
+            logger.info("Streaming translation completed successfully")
+            yield _sse('complete', {})
+
         except Exception as e:
-            logging.error(f"Streaming translation error: {str(e)}", exc_info=True)
-            yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
-    
-    return Response(generate(text, source, target, api_key, model), mimetype='text/event-stream', headers={
+            logger.error("Streaming translation error: %s", e, exc_info=True)
+            yield _sse('error', {'error': str(e)})
+
+    response = Response(_with_keepalive(generate(text, source, target, api_key, model)), mimetype='text/event-stream', headers={
         'Cache-Control': 'no-cache',
         'X-Accel-Buffering': 'no'
     })
+    # Quart caps sending the whole body at RESPONSE_TIMEOUT (60s by default),
+    # but this stream runs three sequential LLM calls of up to 120s each, so
+    # let the chain's own upstream timeouts bound it instead
+    response.timeout = None
+    return response
 
 if __name__ == '__main__':
     # Check for API key on startup
@@ -208,12 +296,12 @@ if __name__ == '__main__':
         print("ERROR: OPENROUTER_API_KEY environment variable not set", file=sys.stderr)
         print("Please set it before running the API server.", file=sys.stderr)
         sys.exit(1)
-    
+
     # Get port from environment variable (Railway provides PORT)
     port = int(os.getenv("PORT", 5000))
     # Disable debug mode in production (Railway sets RAILWAY_ENVIRONMENT)
     debug = os.getenv("RAILWAY_ENVIRONMENT") is None
-    
+
     print("=" * 60)
     print("TransBack API Server")
     print("=" * 60)
@@ -221,6 +309,16 @@ if __name__ == '__main__':
     print(f"API endpoint: POST http://0.0.0.0:{port}/translate")
     print(f"Web UI: http://0.0.0.0:{port}/")
     print("=" * 60)
-    
-    app.run(debug=debug, host='0.0.0.0', port=port)
 
+    if debug:
+        # Development only: single-process server with the reloader
+        app.run(debug=True, host='0.0.0.0', port=port)
+    else:
+        # Production: serve over ASGI with hypercorn. Multi-worker
+        # deployments use the Procfile command (hypercorn --workers N).
+        import asyncio
+        from hypercorn.asyncio import serve
+        from hypercorn.config import Config
+        config = Config()
+        config.bind = [f"0.0.0.0:{port}"]
+        asyncio.run(serve(app, config))
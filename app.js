@@ -117,6 +117,10 @@ form.addEventListener('submit', async (e) => {
     backTranslatedText.innerHTML = 'Waiting for back-translation...';
     backTranslatedText.className = 'result-content empty';
 
+    // Track whether incremental tokens have started for each step
+    let translatedStreaming = false;
+    let backTranslatedStreaming = false;
+
     try {
         const response = await fetch('/translate/stream', {
             method: 'POST',
@@ -152,7 +156,23 @@ form.addEventListener('submit', async (e) => {
                     console.log('Parsed event:', event);
                     
                     if (event) {
-                        if (event.event === 'translated' && event.data && event.data.translated) {
+                        if (event.event === 'translated_delta' && event.data && event.data.delta) {
+                            if (!translatedStreaming) {
+                                translatedStreaming = true;
+                                translatedOutput.textContent = '';
+                                translatedOutput.className = 'result-content';
+                            }
+                            translatedOutput.textContent += event.data.delta;
+                        } else if (event.event === 'back_translated_delta' && event.data && event.data.delta) {
+                            if (!backTranslatedStreaming) {
+                                backTranslatedStreaming = true;
+                                backTranslatedOutput.textContent = '';
+                                backTranslatedOutput.className = 'result-content';
+                                updateStatus(translatedStatus, 'complete');
+                                updateStatus(backTranslatedStatus, 'processing');
+                            }
+                            backTranslatedOutput.textContent += event.data.delta;
+                        } else if (event.event === 'translated' && event.data && event.data.translated) {
                             console.log('Updating translated text');
                             translatedOutput.textContent = event.data.translated;
                             translatedOutput.className = 'result-content';
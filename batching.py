@@ -0,0 +1,144 @@
+# batching.py
+"""Micro-batching layer for translation requests.
+
+Concurrent small translations each pay the full per-call overhead of an
+OpenRouter round trip. BatchingTranslator collects requests that arrive
+within a short window and sends each (source, target, model) group as one
+packed prompt, then splits the model's JSON answer back to the callers.
+Disabled unless TRANSBACK_BATCHING=1 is set."""
+import asyncio
+import logging
+import os
+
+import orjson
+
+from translate import (TRANSLATION_MAX_TOKENS, _build_headers, _post_async,
+                       _random_tag, load_prompt, translate_async)
+
+logger = logging.getLogger("transback.batching")
+
+ENABLED = os.getenv("TRANSBACK_BATCHING") == "1"
+MAX_BATCH = int(os.getenv("TRANSBACK_BATCH_SIZE", "16"))
+WINDOW_MS = int(os.getenv("TRANSBACK_BATCH_WINDOW_MS", "50"))
+
+# How long the drain task waits for a first item before exiting; it is
+# restarted lazily on the next request.
+_IDLE_TIMEOUT = 5.0
+
+class BatchingTranslator:
+    """Collects concurrent translation requests into single OpenRouter calls."""
+
+    def __init__(self, max_batch: int = MAX_BATCH, window_ms: int = WINDOW_MS):
+        self.max_batch = max_batch
+        self.window = window_ms / 1000.0
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._worker: asyncio.Task|None = None
+        # Strong references to in-flight group tasks: asyncio only holds
+        # weak ones, so an unreferenced task could be collected mid-flight
+        self._group_tasks: set = set()
+
+    async def translate(self, text: str, source: str, target: str,
+                        api_key: str, model: str) -> str:
+        """Queue a translation and wait for its batched result."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, source, target, api_key, model, future))
+        self._ensure_worker()
+        return await future
+
+    def _ensure_worker(self):
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._drain())
+
+    async def _drain(self):
+        while True:
+            try:
+                first = await asyncio.wait_for(self._queue.get(), timeout=_IDLE_TIMEOUT)
+            except asyncio.TimeoutError:
+                # An item put in the same loop iteration the timeout fires
+                # would be stranded: _ensure_worker() saw this task as alive,
+                # so nothing would restart it. Only exit on a truly empty queue.
+                if self._queue.empty():
+                    return
+                continue
+            batch = [first]
+            deadline = asyncio.get_running_loop().time() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - asyncio.get_running_loop().time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # Only requests with identical (source, target, model) can share a prompt
+            groups: dict = {}
+            for item in batch:
+                text, source, target, api_key, model, future = item
+                groups.setdefault((source, target, api_key, model), []).append((text, future))
+            for (source, target, api_key, model), items in groups.items():
+                task = asyncio.create_task(self._run_group(source, target, api_key, model, items))
+                self._group_tasks.add(task)
+                task.add_done_callback(self._group_tasks.discard)
+
+    async def _run_group(self, source: str, target: str, api_key: str,
+                         model: str, items: list):
+        if len(items) == 1:
+            # A lone request gains nothing from prompt packing
+            text, future = items[0]
+            await self._run_single(text, source, target, api_key, model, future)
+            return
+
+        logger.info("Batching %d translations %s -> %s into one request", len(items), source, target)
+        try:
+            translations = await self._translate_packed(
+                [text for text, _ in items], source, target, api_key, model)
+        except Exception as e:
+            logger.warning("Batched translation failed (%s); falling back to individual calls", e)
+            for text, future in items:
+                await self._run_single(text, source, target, api_key, model, future)
+            return
+        for (text, future), translation in zip(items, translations):
+            if not future.done():
+                future.set_result(translation)
+
+    async def _run_single(self, text: str, source: str, target: str,
+                          api_key: str, model: str, future: asyncio.Future):
+        try:
+            result = await translate_async(text, source, target, api_key, model)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        else:
+            if not future.done():
+                future.set_result(result)
+
+    async def _translate_packed(self, texts: list, source: str, target: str,
+                                api_key: str, model: str) -> list:
+        # One random tag per batch prevents tag injection, same as translate();
+        # the system prefix stays byte-identical for prompt-prefix cache reuse
+        tag_name = _random_tag()
+        system_prompt = load_prompt("batch_translate_system.txt", source=source, target=target)
+        system_prompt += f"\n\nThe tag name for this request is: {tag_name}"
+        packed = "\n\n".join(
+            f'<{tag_name} id="{i}">\n{text}\n</{tag_name}>'
+            for i, text in enumerate(texts)
+        )
+        body = {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": packed}
+            ],
+            "max_tokens": TRANSLATION_MAX_TOKENS * len(texts),
+        }
+        headers = _build_headers(api_key)
+        r = await _post_async(headers, body)
+        r.raise_for_status()
+        content = orjson.loads(r.content)["choices"][0]["message"]["content"].strip()
+        # Some models wrap JSON answers in markdown fences
+        if content.startswith("```"):
+            content = content.strip("`").removeprefix("json").strip()
+        parsed = orjson.loads(content)
+        by_id = {int(entry["id"]): entry["translation"] for entry in parsed}
+        return [by_id[i] for i in range(len(texts))]
@@ -0,0 +1,83 @@
+# semantic_cache.py
+"""Optional semantic cache for near-duplicate translation requests.
+
+The exact-match cache in translate.py misses on any whitespace or punctuation
+change. This module embeds the source text once per request and returns a
+cached translation when a previous request is within a cosine-distance
+threshold. It is disabled unless TRANSBACK_SEMANTIC_CACHE=1 is set and
+requires the optional sentence-transformers dependency."""
+import logging
+import os
+import threading
+
+logger = logging.getLogger("transback.semantic_cache")
+
+ENABLED = os.getenv("TRANSBACK_SEMANTIC_CACHE") == "1"
+DISTANCE_THRESHOLD = float(os.getenv("TRANSBACK_SEMANTIC_CACHE_THRESHOLD", "0.1"))
+MAX_ENTRIES_PER_KEY = 256
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+_encoder = None
+_lock = threading.Lock()
+# (model, source, target) -> list of (normalized embedding, translation)
+_entries: dict = {}
+
+def _get_encoder():
+    """Load the embedding model lazily; disable the cache if unavailable.
+    Loading is serialized under _lock so concurrent first requests (get/put
+    run on executor threads) don't load the multi-hundred-MB model twice."""
+    global _encoder, ENABLED
+    if _encoder is None:
+        with _lock:
+            if _encoder is None:
+                try:
+                    from sentence_transformers import SentenceTransformer
+                except ImportError:
+                    logger.warning("TRANSBACK_SEMANTIC_CACHE=1 but sentence-transformers "
+                                   "is not installed; semantic cache disabled")
+                    ENABLED = False
+                    return None
+                logger.info("Loading embedding model %s for semantic cache", EMBEDDING_MODEL)
+                _encoder = SentenceTransformer(EMBEDDING_MODEL)
+    return _encoder
+
+def _embed(text: str):
+    encoder = _get_encoder()
+    if encoder is None:
+        return None
+    return encoder.encode(text, normalize_embeddings=True)
+
+def get(text: str, source: str, target: str, model: str) -> str|None:
+    """Return a cached translation for a near-duplicate of text, or None."""
+    if not ENABLED:
+        return None
+    embedding = _embed(text)
+    if embedding is None:
+        return None
+    with _lock:
+        candidates = list(_entries.get((model, source, target), ()))
+    best_distance = None
+    best_translation = None
+    for candidate_embedding, translation in candidates:
+        # Embeddings are normalized, so cosine distance is 1 - dot product
+        distance = 1.0 - float(embedding @ candidate_embedding)
+        if best_distance is None or distance < best_distance:
+            best_distance = distance
+            best_translation = translation
+    if best_distance is not None and best_distance <= DISTANCE_THRESHOLD:
+        logger.debug("Semantic cache hit at distance %.4f", best_distance)
+        return best_translation
+    return None
+
+def put(text: str, source: str, target: str, model: str, translation: str):
+    """Store a translation under the embedding of its source text."""
+    if not ENABLED:
+        return
+    embedding = _embed(text)
+    if embedding is None:
+        return
+    with _lock:
+        entries = _entries.setdefault((model, source, target), [])
+        entries.append((embedding, translation))
+        if len(entries) > MAX_ENTRIES_PER_KEY:
+            del entries[0]
@@ -1,54 +1,158 @@
 # translate.py
-import os, argparse, requests, sys, logging, secrets
+import os, argparse, sys, logging, functools
+import asyncio
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+import httpx
+import orjson
+import semantic_cache
 
 MAX_INPUT_LENGTH = 1500
 TRANSLATION_MAX_TOKENS = 600
 COMPARISON_MAX_TOKENS = 200
+PIPELINE_MAX_TOKENS = 2 * TRANSLATION_MAX_TOKENS + COMPARISON_MAX_TOKENS
+
+# Fuse translate, back-translate and compare into one LLM call when set,
+# trading the three round trips for a single structured-output request
+FUSED_PIPELINE = os.getenv("TRANSBACK_FUSED") == "1"
 
 API_URL = "https://openrouter.ai/api/v1/chat/completions"
 
-def load_prompt(filename: str, **kwargs) -> str:
-    """Load a prompt template from prompts/ directory and format it with kwargs.
-    Placeholders not in kwargs will be left as-is for later replacement."""
+logger = logging.getLogger("transback")
+
+# Random tag names only need to be unpredictable relative to user input, not
+# globally unique, so derive them from one urandom seed plus a counter
+# instead of paying a /dev/urandom syscall on every call. Without the seed
+# the BLAKE2b output stays unguessable.
+_TAG_SEED = os.urandom(32)
+_TAG_COUNTER = itertools.count()
+
+def _random_tag() -> str:
+    counter = next(_TAG_COUNTER)
+    return hashlib.blake2b(_TAG_SEED + counter.to_bytes(8, "little"),
+                           digest_size=8).hexdigest()
+
+# Shared async client for the API server: keep-alive connections and HTTP/2
+# multiplexing let one process serve many concurrent translation chains
+# without holding a worker thread per in-flight upstream call.
+ASYNC_CLIENT = httpx.AsyncClient(
+    http2=True,
+    limits=httpx.Limits(max_connections=256, max_keepalive_connections=64),
+    timeout=120,
+)
+
+# Bound in-flight upstream calls to roughly the keep-alive pool size, so
+# bursts queue here instead of opening piles of short-lived connections
+UPSTREAM_CONCURRENCY = int(os.getenv("TRANSBACK_UPSTREAM_CONCURRENCY", "64"))
+_upstream_semaphore = asyncio.Semaphore(UPSTREAM_CONCURRENCY)
+
+# Shared client for the sync path: HTTP/2 with keep-alive avoids a fresh
+# TCP+TLS handshake for every call in the translate/back-translate/compare
+# chain, and HPACK compresses the repeated auth headers.
+CLIENT = httpx.Client(
+    http2=True,
+    limits=httpx.Limits(max_connections=32, max_keepalive_connections=32),
+    timeout=120,
+    transport=httpx.HTTPTransport(retries=2),
+)
+
+# The transport retries above only cover connect errors; rate limits and
+# transient upstream failures come back as status codes, so those are
+# retried here with exponential backoff, like the urllib3 Retry the
+# requests-based client used.
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF = 0.5
+
+def _post(headers: dict, body: dict) -> httpx.Response:
+    """POST to OpenRouter, retrying transient upstream statuses with backoff."""
+    for attempt in range(RETRY_ATTEMPTS):
+        r = CLIENT.post(API_URL, headers=headers, json=body)
+        if r.status_code not in RETRY_STATUS_CODES or attempt == RETRY_ATTEMPTS - 1:
+            return r
+        delay = RETRY_BACKOFF * 2 ** attempt
+        logger.warning("Upstream returned %d; retrying in %.1fs", r.status_code, delay)
+        time.sleep(delay)
+    return r
+
+async def _post_async(headers: dict, body: dict) -> httpx.Response:
+    """Async variant of _post(); holds the upstream semaphore per attempt so
+    a backoff sleep doesn't pin a connection slot."""
+    for attempt in range(RETRY_ATTEMPTS):
+        async with _upstream_semaphore:
+            r = await ASYNC_CLIENT.post(API_URL, headers=headers, json=body)
+        if r.status_code not in RETRY_STATUS_CODES or attempt == RETRY_ATTEMPTS - 1:
+            return r
+        delay = RETRY_BACKOFF * 2 ** attempt
+        logger.warning("Upstream returned %d; retrying in %.1fs", r.status_code, delay)
+        await asyncio.sleep(delay)
+    return r
+
+# Exact-match response cache: identical (model, languages, text) requests are
+# common for repeated UI edits and retries, and a hit skips a multi-second
+# LLM call. Bounded LRU with a TTL; set OPENROUTER_CACHE_TTL=0 to disable.
+RESPONSE_CACHE_SIZE = 1024
+RESPONSE_CACHE_TTL = float(os.getenv("OPENROUTER_CACHE_TTL", "3600"))
+
+_response_cache: OrderedDict = OrderedDict()
+_response_cache_lock = threading.Lock()
+
+def _cache_key(*parts: str) -> str:
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+def _cache_get(key: str) -> str|None:
+    if RESPONSE_CACHE_TTL <= 0:
+        return None
+    with _response_cache_lock:
+        entry = _response_cache.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if time.monotonic() > expires:
+            del _response_cache[key]
+            return None
+        _response_cache.move_to_end(key)
+        return value
+
+def _cache_put(key: str, value: str):
+    if RESPONSE_CACHE_TTL <= 0:
+        return
+    with _response_cache_lock:
+        _response_cache[key] = (time.monotonic() + RESPONSE_CACHE_TTL, value)
+        _response_cache.move_to_end(key)
+        while len(_response_cache) > RESPONSE_CACHE_SIZE:
+            _response_cache.popitem(last=False)
+
+class _SafeDict(dict):
+    """Format mapping that leaves unknown placeholders intact for later replacement."""
+    def __missing__(self, key):
+        return "{" + key + "}"
+
+@functools.lru_cache(maxsize=16)
+def _read_template(filename: str) -> str:
+    """Read a prompt template from the prompts/ directory, cached across calls."""
     prompt_path = os.path.join("prompts", filename)
-    logging.debug(f"Loading prompt from {prompt_path}")
+    logger.debug("Loading prompt from %s", prompt_path)
     with open(prompt_path, "r", encoding="utf-8") as f:
-        template = f.read().strip()
-    
-    # Temporarily replace placeholders that aren't in kwargs to avoid KeyError
-    # Use a unique marker that won't appear in the template
-    temp_markers = {}
-    import re
-    # Find all unique placeholders
-    placeholders_to_escape = set()
-    for match in re.finditer(r'\{(\w+)\}', template):
-        placeholder = match.group(1)
-        if placeholder not in kwargs:
-            placeholders_to_escape.add(placeholder)
-    
-    # Replace each placeholder that's not in kwargs with a temporary marker
-    for placeholder in placeholders_to_escape:
-        marker = f"__TEMP_PLACEHOLDER_{placeholder}__"
-        temp_markers[marker] = f"{{{placeholder}}}"
-        template = template.replace(f"{{{placeholder}}}", marker)
-    
-    # Format with provided kwargs
-    result = template.format(**kwargs)
-    
-    # Restore placeholders that weren't in kwargs
-    for marker, original in temp_markers.items():
-        result = result.replace(marker, original)
-    
-    return result
+        return f.read().strip()
 
-def translate(text: str, source: str, target: str, api_key: str,
-              model: str, app_url: str|None=None, app_title: str|None=None,
-              max_tokens: int = TRANSLATION_MAX_TOKENS) -> str:
-    if len(text) > MAX_INPUT_LENGTH:
-        raise ValueError(f"Input text exceeds {MAX_INPUT_LENGTH} characters")
-    logging.info(f"Translating from {source} to {target} using model {model}")
-    logging.debug(f"Text length: {len(text)} characters")
-    
+@functools.lru_cache(maxsize=128)
+def _format_prompt(filename: str, items: tuple) -> str:
+    return _read_template(filename).format_map(_SafeDict(items))
+
+def load_prompt(filename: str, **kwargs) -> str:
+    """Load a prompt template from prompts/ directory and format it with kwargs.
+    Placeholders not in kwargs will be left as-is for later replacement.
+    Formatted results are cached, so repeated calls with the same arguments
+    cost a dict lookup instead of file I/O and string processing."""
+    return _format_prompt(filename, tuple(sorted(kwargs.items())))
+
+def _build_headers(api_key: str, app_url: str|None=None, app_title: str|None=None) -> dict:
     headers = {
         "Authorization": f"Bearer {api_key}",
         "Content-Type": "application/json",
@@ -57,133 +161,354 @@ def translate(text: str, source: str, target: str, api_key: str,
         headers["HTTP-Referer"] = app_url
     if app_title:
         headers["X-Title"] = app_title
+    return headers
 
+def _translate_body(text: str, source: str, target: str, model: str,
+                    max_tokens: int) -> dict:
     # Generate a single random tag name to prevent tag injection attacks
     # If user input contains closing tags, they won't match our unique random tag
-    tag_name = secrets.token_hex(8)
-    
-    # Load template and replace tag_name in all occurrences
-    system_prompt_template = load_prompt("translate_system.txt", source=source, target=target)
-    system_prompt_template = system_prompt_template.replace("{tag_name}", tag_name)
-    
-    # Append user text to system message with explicit tags for better isolation
-    # This prevents prompt injection by keeping everything in the system role
-    # Using random tag suffix prevents premature tag closure attacks
-    tagged_text = f"\n\n<{tag_name}>\n{text}\n</{tag_name}>"
-    system_prompt = system_prompt_template + tagged_text
-
-    body = {
+    tag_name = _random_tag()
+
+    # The long system prefix stays byte-identical across requests (the random
+    # tag only appears in a short suffix and the user message), so provider
+    # prompt-prefix caches can reuse the prefill for the shared tokens
+    system_prompt = load_prompt("translate_system.txt", source=source, target=target)
+    system_prompt += f"\n\nThe tag name for this request is: {tag_name}"
+
+    # User text goes in its own message, isolated by the random tags so
+    # premature tag closure attacks don't match
+    user_content = f"<{tag_name}>\n{text}\n</{tag_name}>"
+
+    return {
         "model": model,
         "messages": [
-            {"role": "system", "content": system_prompt}
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_content}
         ],
         "max_tokens": max_tokens
     }
 
-    # Log the full message being sent for review
-    logging.info("=" * 60)
-    logging.info("OUTGOING TRANSLATION REQUEST MESSAGE:")
-    logging.info("=" * 60)
-    logging.info(f"Model: {model}")
-    logging.info(f"Messages:")
-    for msg in body["messages"]:
-        logging.info(f"  Role: {msg['role']}")
-        logging.info(f"  Content:\n{msg['content']}")
-    logging.info("=" * 60)
-    
-    logging.debug(f"Sending translation request to {API_URL}")
-    r = requests.post(API_URL, headers=headers, json=body, timeout=120)
+def _compare_body(original: str, back_translated: str, language: str, model: str,
+                  max_tokens: int) -> dict:
+    # Generate random tag names to prevent tag injection attacks
+    # If user input contains closing tags, they won't match our unique random tags
+    # One random number per tag type
+    original_tag_name = _random_tag()
+    back_tag_name = _random_tag()
+
+    # Byte-identical system prefix for prompt-prefix cache reuse; the random
+    # tag names only appear in the short suffix and the user message
+    system_prompt = load_prompt("compare_system.txt", language=language)
+    system_prompt += (f"\n\nThe tag name for the original text is: {original_tag_name}"
+                      f"\nThe tag name for the back-translated text is: {back_tag_name}")
+
+    # Texts go in their own message, isolated by the random tags so
+    # premature tag closure attacks don't match
+    user_content = (f"<{original_tag_name}>\n{original}\n</{original_tag_name}>\n\n"
+                    f"<{back_tag_name}>\n{back_translated}\n</{back_tag_name}>\n\n"
+                    "Do these texts have the same meaning? If yes, respond with exactly 'SAME'. "
+                    "If no, describe the semantic differences concisely.")
+
+    return {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_content}
+        ],
+        "max_tokens": max_tokens
+    }
+
+def _log_outgoing(kind: str, body: dict):
+    # Full prompts are KB-scale; only format and emit them when DEBUG is on.
+    # Lazy %s args keep the strings unbuilt when the level is disabled.
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Outgoing %s request: model=%s messages=%s",
+                     kind.lower(), body["model"], body["messages"])
+
+def _log_response(kind: str, result: str):
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Incoming %s response:\n%s", kind.lower(), result)
+
+def translate(text: str, source: str, target: str, api_key: str,
+              model: str, app_url: str|None=None, app_title: str|None=None,
+              max_tokens: int = TRANSLATION_MAX_TOKENS) -> str:
+    if len(text) > MAX_INPUT_LENGTH:
+        raise ValueError(f"Input text exceeds {MAX_INPUT_LENGTH} characters")
+    logger.info("Translating from %s to %s using model %s", source, target, model)
+    logger.debug("Text length: %d characters", len(text))
+
+    cache_key = _cache_key(model, source, target, text)
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        logger.info("Translation served from response cache")
+        return cached
+
+    if semantic_cache.ENABLED:
+        hit = semantic_cache.get(text, source, target, model)
+        if hit is not None:
+            logger.info("Translation served from semantic cache")
+            return hit
+
+    headers = _build_headers(api_key, app_url, app_title)
+    body = _translate_body(text, source, target, model, max_tokens)
+    _log_outgoing("TRANSLATION", body)
+
+    logger.debug("Sending translation request to %s", API_URL)
+    r = _post(headers, body)
     r.raise_for_status()
-    result = r.json()["choices"][0]["message"]["content"]
-    
-    # Log the AI response
-    logging.info("=" * 60)
-    logging.info("INCOMING TRANSLATION RESPONSE:")
-    logging.info("=" * 60)
-    logging.info(f"Response:\n{result}")
-    logging.info("=" * 60)
-    
-    logging.info(f"Translation completed. Result length: {len(result)} characters")
+    result = orjson.loads(r.content)["choices"][0]["message"]["content"]
+    _cache_put(cache_key, result)
+    semantic_cache.put(text, source, target, model, result)
+
+    _log_response("TRANSLATION", result)
+
+    logger.info("Translation completed. Result length: %d characters", len(result))
+    return result
+
+async def translate_async(text: str, source: str, target: str, api_key: str,
+                          model: str, app_url: str|None=None, app_title: str|None=None,
+                          max_tokens: int = TRANSLATION_MAX_TOKENS) -> str:
+    """Async variant of translate() for the API server, using the shared client."""
+    if len(text) > MAX_INPUT_LENGTH:
+        raise ValueError(f"Input text exceeds {MAX_INPUT_LENGTH} characters")
+    logger.info("Translating from %s to %s using model %s", source, target, model)
+    logger.debug("Text length: %d characters", len(text))
+
+    cache_key = _cache_key(model, source, target, text)
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        logger.info("Translation served from response cache")
+        return cached
+
+    if semantic_cache.ENABLED:
+        # encode() (and the first-use model load) is CPU-bound; run it in a
+        # thread so it doesn't stall every other request on the event loop
+        hit = await asyncio.to_thread(semantic_cache.get, text, source, target, model)
+        if hit is not None:
+            logger.info("Translation served from semantic cache")
+            return hit
+
+    headers = _build_headers(api_key, app_url, app_title)
+    body = _translate_body(text, source, target, model, max_tokens)
+    _log_outgoing("TRANSLATION", body)
+
+    logger.debug("Sending translation request to %s", API_URL)
+    r = await _post_async(headers, body)
+    r.raise_for_status()
+    result = orjson.loads(r.content)["choices"][0]["message"]["content"]
+    _cache_put(cache_key, result)
+    if semantic_cache.ENABLED:
+        await asyncio.to_thread(semantic_cache.put, text, source, target, model, result)
+
+    _log_response("TRANSLATION", result)
+
+    logger.info("Translation completed. Result length: %d characters", len(result))
     return result
 
 def compare_meanings(original: str, back_translated: str, language: str, api_key: str,
                      model: str, app_url: str|None=None, app_title: str|None=None,
                      max_tokens: int = COMPARISON_MAX_TOKENS) -> str:
-    logging.info(f"Comparing meanings in {language} using model {model}")
-    logging.debug(f"Original length: {len(original)} characters, Back-translated length: {len(back_translated)} characters")
-    
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json",
-    }
-    if app_url:
-        headers["HTTP-Referer"] = app_url
-    if app_title:
-        headers["X-Title"] = app_title
+    logger.info("Comparing meanings in %s using model %s", language, model)
+    logger.debug("Original length: %d characters, Back-translated length: %d characters", len(original), len(back_translated))
 
-    # Generate random tag names to prevent tag injection attacks
-    # If user input contains closing tags, they won't match our unique random tags
-    # One random number per tag type
-    original_tag_name = secrets.token_hex(8)
-    back_tag_name = secrets.token_hex(8)
-    
-    # Load template and replace tag names in all occurrences
-    system_prompt_template = load_prompt("compare_system.txt", language=language)
-    system_prompt_template = system_prompt_template.replace("{original_tag_name}", original_tag_name)
-    system_prompt_template = system_prompt_template.replace("{back_tag_name}", back_tag_name)
-    
-    # Append texts to system message with explicit tags for better isolation
-    # This prevents prompt injection by keeping everything in the system role
-    # Using random tag suffixes prevents premature tag closure attacks
-    tagged_texts = f"\n\n<{original_tag_name}>\n{original}\n</{original_tag_name}>\n\n<{back_tag_name}>\n{back_translated}\n</{back_tag_name}>\n\nDo these texts have the same meaning? If yes, respond with exactly 'SAME'. If no, describe the semantic differences concisely."
-    system_prompt = system_prompt_template + tagged_texts
-    
-    body = {
+    cache_key = _cache_key(model, language, original, back_translated)
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        logger.info("Comparison served from response cache")
+        return cached
+
+    headers = _build_headers(api_key, app_url, app_title)
+    body = _compare_body(original, back_translated, language, model, max_tokens)
+    _log_outgoing("COMPARISON", body)
+
+    logger.debug("Sending comparison request to %s", API_URL)
+    r = _post(headers, body)
+    r.raise_for_status()
+    result = orjson.loads(r.content)["choices"][0]["message"]["content"]
+    _cache_put(cache_key, result)
+
+    _log_response("COMPARISON", result)
+
+    logger.info("Meaning comparison completed")
+    return result
+
+async def translate_stream_async(text: str, source: str, target: str, api_key: str,
+                                 model: str, app_url: str|None=None, app_title: str|None=None,
+                                 max_tokens: int = TRANSLATION_MAX_TOKENS):
+    """Streaming variant of translate_async(): yields content deltas as
+    OpenRouter produces them, so callers can forward tokens immediately.
+    The caller accumulates the deltas into the final translation."""
+    if len(text) > MAX_INPUT_LENGTH:
+        raise ValueError(f"Input text exceeds {MAX_INPUT_LENGTH} characters")
+    logger.info("Translating (streaming) from %s to %s using model %s", source, target, model)
+    logger.debug("Text length: %d characters", len(text))
+
+    cache_key = _cache_key(model, source, target, text)
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        logger.info("Translation served from response cache")
+        yield cached
+        return
+
+    if semantic_cache.ENABLED:
+        # encode() (and the first-use model load) is CPU-bound; run it in a
+        # thread so it doesn't stall every other request on the event loop
+        hit = await asyncio.to_thread(semantic_cache.get, text, source, target, model)
+        if hit is not None:
+            logger.info("Translation served from semantic cache")
+            yield hit
+            return
+
+    headers = _build_headers(api_key, app_url, app_title)
+    body = _translate_body(text, source, target, model, max_tokens)
+    body["stream"] = True
+    _log_outgoing("TRANSLATION", body)
+
+    logger.debug("Sending streaming translation request to %s", API_URL)
+    chunks = []
+    for attempt in range(RETRY_ATTEMPTS):
+        async with _upstream_semaphore, \
+                   ASYNC_CLIENT.stream("POST", API_URL, headers=headers, json=body) as r:
+            # A retryable status arrives before any token is yielded, so the
+            # stream can be reopened without the client seeing duplicates
+            if r.status_code in RETRY_STATUS_CODES and attempt < RETRY_ATTEMPTS - 1:
+                delay = RETRY_BACKOFF * 2 ** attempt
+                logger.warning("Upstream returned %d; retrying in %.1fs", r.status_code, delay)
+            else:
+                r.raise_for_status()
+                async for line in r.aiter_lines():
+                    if not line.startswith("data: "):
+                        continue
+                    payload = line[len("data: "):]
+                    if payload == "[DONE]":
+                        break
+                    delta = orjson.loads(payload)["choices"][0].get("delta", {}).get("content")
+                    if delta:
+                        chunks.append(delta)
+                        yield delta
+                break
+        await asyncio.sleep(delay)
+    result = "".join(chunks)
+    _cache_put(cache_key, result)
+    if semantic_cache.ENABLED:
+        await asyncio.to_thread(semantic_cache.put, text, source, target, model, result)
+
+    _log_response("TRANSLATION", result)
+
+    logger.info("Translation completed. Result length: %d characters", len(result))
+
+def _pipeline_body(text: str, source: str, target: str, model: str,
+                   max_tokens: int = PIPELINE_MAX_TOKENS) -> dict:
+    # Same tag isolation and cache-friendly message layout as _translate_body
+    tag_name = _random_tag()
+    system_prompt = load_prompt("pipeline_system.txt", source=source, target=target)
+    system_prompt += f"\n\nThe tag name for this request is: {tag_name}"
+    user_content = f"<{tag_name}>\n{text}\n</{tag_name}>"
+
+    return {
         "model": model,
         "messages": [
-            {"role": "system", "content": system_prompt}
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_content}
         ],
-        "max_tokens": max_tokens
+        "max_tokens": max_tokens,
+        "response_format": {"type": "json_object"}
+    }
+
+def _parse_pipeline_response(content: str) -> dict:
+    content = content.strip()
+    # Some models wrap JSON answers in markdown fences despite JSON mode
+    if content.startswith("```"):
+        content = content.strip("`").removeprefix("json").strip()
+    parsed = orjson.loads(content)
+    return {
+        "translated": parsed["translated"],
+        "back_translated": parsed["back_translated"],
+        "review": parsed["review"],
     }
 
-    # Log the full message being sent for review
-    logging.info("=" * 60)
-    logging.info("OUTGOING COMPARISON REQUEST MESSAGE:")
-    logging.info("=" * 60)
-    logging.info(f"Model: {model}")
-    logging.info(f"Messages:")
-    for msg in body["messages"]:
-        logging.info(f"  Role: {msg['role']}")
-        logging.info(f"  Content:\n{msg['content']}")
-    logging.info("=" * 60)
-    
-    logging.debug(f"Sending comparison request to {API_URL}")
-    r = requests.post(API_URL, headers=headers, json=body, timeout=120)
+async def translate_pipeline_async(text: str, source: str, target: str, api_key: str,
+                                   model: str, app_url: str|None=None, app_title: str|None=None) -> dict:
+    """Run the whole translate/back-translate/compare chain as a single LLM
+    call, returning a dict with translated, back_translated and review.
+    Raises on upstream or parse failure; callers fall back to the
+    three-step chain."""
+    if len(text) > MAX_INPUT_LENGTH:
+        raise ValueError(f"Input text exceeds {MAX_INPUT_LENGTH} characters")
+    logger.info("Fused pipeline %s -> %s using model %s", source, target, model)
+    logger.debug("Text length: %d characters", len(text))
+
+    headers = _build_headers(api_key, app_url, app_title)
+    body = _pipeline_body(text, source, target, model)
+    _log_outgoing("PIPELINE", body)
+
+    logger.debug("Sending fused pipeline request to %s", API_URL)
+    r = await _post_async(headers, body)
     r.raise_for_status()
-    result = r.json()["choices"][0]["message"]["content"]
-    
-    # Log the AI response
-    logging.info("=" * 60)
-    logging.info("INCOMING COMPARISON RESPONSE:")
-    logging.info("=" * 60)
-    logging.info(f"Response:\n{result}")
-    logging.info("=" * 60)
-    
-    logging.info("Meaning comparison completed")
+    content = orjson.loads(r.content)["choices"][0]["message"]["content"]
+    result = _parse_pipeline_response(content)
+
+    _log_response("PIPELINE", content)
+
+    logger.info("Fused pipeline completed")
     return result
 
-def main():
-    # Configure logging
+async def compare_meanings_async(original: str, back_translated: str, language: str, api_key: str,
+                                 model: str, app_url: str|None=None, app_title: str|None=None,
+                                 max_tokens: int = COMPARISON_MAX_TOKENS) -> str:
+    """Async variant of compare_meanings() for the API server, using the shared client."""
+    logger.info("Comparing meanings in %s using model %s", language, model)
+    logger.debug("Original length: %d characters, Back-translated length: %d characters", len(original), len(back_translated))
+
+    cache_key = _cache_key(model, language, original, back_translated)
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        logger.info("Comparison served from response cache")
+        return cached
+
+    headers = _build_headers(api_key, app_url, app_title)
+    body = _compare_body(original, back_translated, language, model, max_tokens)
+    _log_outgoing("COMPARISON", body)
+
+    logger.debug("Sending comparison request to %s", API_URL)
+    r = await _post_async(headers, body)
+    r.raise_for_status()
+    result = orjson.loads(r.content)["choices"][0]["message"]["content"]
+    _cache_put(cache_key, result)
+
+    _log_response("COMPARISON", result)
+
+    logger.info("Meaning comparison completed")
+    return result
+
+def _write_file(path: str, data: str):
+    """Write a result file; runs on the background writer so disk I/O
+    overlaps with the next API call."""
+    Path(path).write_text(data, encoding="utf-8")
+    logger.info("Saved %s", path)
+
+_BANNER = "=" * 60
+_RULE = "-" * 60
+
+def _configure_logging(level: int = logging.INFO):
+    """Configure root logging; clears existing handlers first so repeated
+    calls (e.g. when imported alongside the API server) don't duplicate
+    output."""
+    root = logging.getLogger()
+    root.handlers.clear()
     logging.basicConfig(
-        level=logging.INFO,
+        level=level,
         format='%(asctime)s - %(levelname)s - %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
-    
-    logging.info("=" * 60)
-    logging.info("TransBack Translation Tool - Starting")
-    logging.info("=" * 60)
-    
+
+def main():
+    _configure_logging()
+
+    logger.info(_BANNER)
+    logger.info("TransBack Translation Tool - Starting")
+    logger.info(_BANNER)
+
     p = argparse.ArgumentParser(description="File translator via OpenRouter/Qwen")
     p.add_argument("input_file")
     p.add_argument("output_file")
@@ -197,67 +522,72 @@ def main():
 
     if args.debug:
         logging.getLogger().setLevel(logging.DEBUG)
-        logging.debug("Debug logging enabled")
+        logger.debug("Debug logging enabled")
 
-    logging.info(f"Input file: {args.input_file}")
-    logging.info(f"Output file: {args.output_file}")
-    logging.info(f"Source language: {args.source}")
-    logging.info(f"Target language: {args.target}")
-    logging.info(f"Model: {args.model}")
+    logger.info("Input file: %s", args.input_file)
+    logger.info("Output file: %s", args.output_file)
+    logger.info("Source language: %s", args.source)
+    logger.info("Target language: %s", args.target)
+    logger.info("Model: %s", args.model)
 
     api_key = os.getenv("OPENROUTER_API_KEY")
     if not api_key:
-        logging.error("OPENROUTER_API_KEY environment variable not set")
+        logger.error("OPENROUTER_API_KEY environment variable not set")
         print("Set OPENROUTER_API_KEY env var.", file=sys.stderr)
         sys.exit(1)
-    logging.debug("API key found")
+    logger.debug("API key found")
 
-    logging.info(f"Reading input file: {args.input_file}")
+    logger.info("Reading input file: %s", args.input_file)
     with open(args.input_file, "r", encoding="utf-8") as f:
         src = f.read()
-    logging.info(f"Input file read successfully. Length: {len(src)} characters")
+    logger.info("Input file read successfully. Length: %d characters", len(src))
 
     if len(src) > MAX_INPUT_LENGTH:
-        logging.error(f"Input too long: {len(src)} characters (limit {MAX_INPUT_LENGTH})")
+        logger.error("Input too long: %d characters (limit %d)", len(src), MAX_INPUT_LENGTH)
         print(f"Input too long: {len(src)} characters (limit {MAX_INPUT_LENGTH})", file=sys.stderr)
         sys.exit(1)
 
-    logging.info("-" * 60)
-    logging.info("Step 1/3: Translating to target language")
-    logging.info("-" * 60)
+    # Result files are written off the critical path so disk I/O overlaps
+    # with the next LLM call
+    writer = ThreadPoolExecutor(max_workers=2)
+    writes = []
+
+    logger.info(_RULE)
+    logger.info("Step 1/3: Translating to target language")
+    logger.info(_RULE)
     out = translate(src, args.source, args.target, api_key,
                     args.model, args.app_url, args.app_title)
 
-    logging.info(f"Writing translation to {args.output_file}")
-    with open(args.output_file, "w", encoding="utf-8") as f:
-        f.write(out)
-    logging.info(f"Translation saved to {args.output_file}")
+    logger.info("Writing translation to %s", args.output_file)
+    writes.append(writer.submit(_write_file, args.output_file, out))
 
-    logging.info("-" * 60)
-    logging.info("Step 2/3: Back-translating to source language")
-    logging.info("-" * 60)
+    logger.info(_RULE)
+    logger.info("Step 2/3: Back-translating to source language")
+    logger.info(_RULE)
     back = translate(out, args.target, args.source, api_key,
                      args.model, args.app_url, args.app_title)
 
-    logging.info("Writing back-translation to back.txt")
-    with open("back.txt", "w", encoding="utf-8") as f:
-        f.write(back)
-    logging.info("Back-translation saved to back.txt")
+    logger.info("Writing back-translation to back.txt")
+    writes.append(writer.submit(_write_file, "back.txt", back))
 
-    logging.info("-" * 60)
-    logging.info("Step 3/3: Comparing meanings")
-    logging.info("-" * 60)
+    logger.info(_RULE)
+    logger.info("Step 3/3: Comparing meanings")
+    logger.info(_RULE)
     review = compare_meanings(src, back, args.source, api_key,
                               args.model, args.app_url, args.app_title)
 
-    logging.info("Writing comparison review to review.txt")
-    with open("review.txt", "w", encoding="utf-8") as f:
-        f.write(review)
-    logging.info("Comparison review saved to review.txt")
+    logger.info("Writing comparison review to review.txt")
+    writes.append(writer.submit(_write_file, "review.txt", review))
+
+    # Flush all pending writes before reporting success; result() re-raises
+    # any write failure so a bad path or full disk still aborts the run
+    for write in writes:
+        write.result()
+    writer.shutdown(wait=True)
 
-    logging.info("=" * 60)
-    logging.info("Translation process completed successfully!")
-    logging.info("=" * 60)
+    logger.info(_BANNER)
+    logger.info("Translation process completed successfully!")
+    logger.info(_BANNER)
 
 if __name__ == "__main__":
     main()